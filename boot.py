@@ -7,6 +7,7 @@ import esp
 import gc
 import machine
 import network
+import sys
 import time
 
 # Disable ESP32 debug output (reduces noise in console)
@@ -15,13 +16,14 @@ esp.osdebug(None)
 # Enable automatic garbage collection
 gc.enable()
 
-print("=" * 50)
-print("ESP32 Tank Monitor - Boot Sequence")
-print("=" * 50)
-import sys
-print("MicroPython version: {}".format(str(sys.version)))
-print("Free memory: {} bytes".format(gc.mem_free()))
-print("Boot reason: {}".format(machine.reset_cause()))
+# Banner is written in one call rather than one print() per line
+sys.stdout.write(
+    "==================================================\n"
+    "ESP32 Tank Monitor - Boot Sequence\n"
+    "==================================================\n"
+    "MicroPython version: {}\n"
+    "Free memory: {} bytes\n"
+    "Boot reason: {}\n".format(sys.version, gc.mem_free(), machine.reset_cause()))
 
 # Optional: Set CPU frequency to save power
 # Default is 240MHz, you can reduce to 160MHz or 80MHz
@@ -30,23 +32,27 @@ print("Boot reason: {}".format(machine.reset_cause()))
 # Disable WiFi access point mode (saves power)
 ap = network.WLAN(network.AP_IF)
 ap.active(False)
+gc.collect()  # Reclaim AP driver allocations before the next phase
 print("✓ WiFi AP mode disabled")
 
 # Pre-configure WiFi station mode (doesn't connect yet)
 sta = network.WLAN(network.STA_IF)
 sta.active(True)
+gc.collect()  # Keep the heap compact before main.py starts allocating
 print("✓ WiFi station mode enabled")
 
 # Optional: Configure power management
 # machine.lightsleep()  # Enable light sleep mode for power saving
 
-# Brief delay for hardware stabilization
+# Brief delay for hardware stabilization - the VL53L1X driver waits for
+# its own settle time during init, so only the STA driver needs covering here
 print("Hardware stabilization delay...")
-time.sleep(2)
+time.sleep_ms(200)
 
-print("✓ Boot sequence completed")
-print("Starting main application...")
-print("=" * 50)
+sys.stdout.write(
+    "✓ Boot sequence completed\n"
+    "Starting main application...\n"
+    "==================================================\n")
 
 # Collect garbage before main.py starts
 gc.collect()
@@ -7,12 +7,21 @@ Copyright (C) 2025
 SPDX-License-Identifier: GPL-3.0-or-later
 """
 
+import errno
 import json
 import os
 import gc
 import ubinascii
 import network
 
+def _file_exists(path):
+    """Check if file exists (MicroPython compatible)"""
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
 class ConfigError(Exception):
     """Configuration related errors"""
     pass
@@ -25,16 +34,51 @@ class ConfigManager:
         self.config_template_path = "config/config.json.template"
         self.config = None
         self._device_mac = None
+        # Plaintext passwords - set during migration if already known
+        self._wifi_password_plain = None
+        self._mqtt_password_plain = None
+        self._mac_key_bytes = None
+        self._recover_interrupted_save()
+        self._get_device_mac()  # Acquire the key up front; fails fast if unavailable
         self._load_config()
 
+        # Decrypt once at startup; reconnect paths reuse the cached values
+        if self._wifi_password_plain is None:
+            self._wifi_password_plain = self._decrypt_password(self.get('wifi', 'password'))
+        if self._mqtt_password_plain is None:
+            self._mqtt_password_plain = self._decrypt_password(self.get('mqtt', 'password'))
+
+        # Accessor results are pure functions of self.config - build them once
+        self._cache_sections()
+        gc.collect()  # Drop decryption intermediates
+
+    def _recover_interrupted_save(self):
+        """Clean up the temp file left by an interrupted _save_config()"""
+        tmp_path = self.config_path + '.tmp'
+        if not self._file_exists(tmp_path):
+            return
+        try:
+            if self._file_exists(self.config_path):
+                # Interrupted before the rename; the live config is intact
+                os.remove(tmp_path)
+            else:
+                # Interrupted between removing the old config and the rename;
+                # the temp file is complete and is the only copy
+                os.rename(tmp_path, self.config_path)
+        except OSError as e:
+            print("Could not clean up {}: {}".format(tmp_path, str(e)))
+
     def _load_config(self):
         """Load configuration from file with fallback to template"""
         try:
             # Try to load the actual config file
             if self._file_exists(self.config_path):
-                with open(self.config_path, 'r') as f:
-                    self.config = json.load(f)
-                    print("Configuration loaded from {}".format(self.config_path))
+                # Single bulk read; json.load() on a stream reads byte-by-byte
+                with open(self.config_path, 'rb') as f:
+                    data = f.read()
+                self.config = json.loads(data)
+                del data
+                print("Configuration loaded from {}".format(self.config_path))
             else:
                 # Config file doesn't exist, check for template
                 if self._file_exists(self.config_template_path):
@@ -59,12 +103,7 @@ class ConfigManager:
 
     def _file_exists(self, path):
         """Check if file exists (MicroPython compatible)"""
-        try:
-            with open(path, 'r'):
-                pass
-            return True
-        except OSError:
-            return False
+        return _file_exists(path)
 
     def _get_device_mac(self):
         """Get device MAC address for encryption key - strict mode"""
@@ -72,6 +111,8 @@ class ConfigManager:
             try:
                 mac = ubinascii.hexlify(network.WLAN().config('mac')).decode()
                 self._device_mac = mac
+                # Key bytes for the XOR helpers, encoded once at acquisition
+                self._mac_key_bytes = mac.encode()
                 print("Device MAC acquired for secure encryption: {}...".format(mac[:6]))
             except Exception as e:
                 print("=" * 60)
@@ -92,17 +133,22 @@ class ConfigManager:
                 raise ConfigError("Device MAC unavailable - encryption failed. See troubleshooting above.")
         return self._device_mac
 
+    def _extended_key(self, n):
+        """Return the MAC key repeated to exactly n bytes"""
+        k = self._mac_key_bytes
+        return (k * (n // len(k) + 1))[:n]
+
     def _encrypt_password(self, password):
         """Encrypt password using device MAC as key"""
         if not password:
             return ""
 
-        mac_key = self._get_device_mac()  # Will fail completely if MAC unavailable
-        encrypted = bytearray()
+        pwd = password.encode()
+        n = len(pwd)
+        keyrep = self._extended_key(n)
 
-        for i, char in enumerate(password):
-            key_char = mac_key[i % len(mac_key)]
-            encrypted.append(ord(char) ^ ord(key_char))
+        # Single bignum XOR over the whole buffer instead of a per-byte loop
+        encrypted = (int.from_bytes(pwd, 'big') ^ int.from_bytes(keyrep, 'big')).to_bytes(n, 'big')
 
         # Base64 encode for JSON storage with prefix to indicate encryption method
         encrypted_b64 = ubinascii.b2a_base64(encrypted).decode().strip()
@@ -118,7 +164,6 @@ class ConfigManager:
             raise ConfigError("Invalid encryption format. Expected 'mac_xor:' prefix.")
 
         encrypted_b64 = encrypted_value[8:]  # Remove "mac_xor:" prefix
-        mac_key = self._get_device_mac()  # Will fail completely if MAC unavailable
 
         try:
             encrypted = ubinascii.a2b_base64(encrypted_b64)
@@ -130,69 +175,78 @@ class ConfigManager:
             print("- File tampering")
             raise ConfigError("Password decryption failed - invalid data format")
 
-        decrypted = ""
-        for i, byte in enumerate(encrypted):
-            key_char = mac_key[i % len(mac_key)]
-            decrypted += chr(byte ^ ord(key_char))
+        n = len(encrypted)
+        keyrep = self._extended_key(n)
 
-        return decrypted
+        decrypted = (int.from_bytes(encrypted, 'big') ^ int.from_bytes(keyrep, 'big')).to_bytes(n, 'big')
+        return decrypted.decode()
 
     def _migrate_plaintext_passwords(self):
         """Auto-migrate plaintext passwords to encrypted format"""
-        config_changed = False
+        # _validate_config() guarantees both sections and passwords exist
+        wifi = self.config['wifi']
+        mqtt = self.config['mqtt']
+        wifi_password = wifi['password']
+        mqtt_password = mqtt['password']
+
+        # Steady state: both already encrypted, nothing to do
+        if wifi_password.startswith('mac_xor:') and mqtt_password.startswith('mac_xor:'):
+            return
 
         # Check WiFi password
-        if 'wifi' in self.config and 'password' in self.config['wifi']:
-            plaintext_password = self.config['wifi']['password']
-            if plaintext_password and not plaintext_password.startswith('mac_xor:'):
-                print("Migrating WiFi password to encrypted format...")
-                encrypted_password = self._encrypt_password(plaintext_password)
-                self.config['wifi']['password'] = encrypted_password
-                config_changed = True
+        if not wifi_password.startswith('mac_xor:'):
+            print("Migrating WiFi password to encrypted format...")
+            self._wifi_password_plain = wifi_password
+            wifi['password'] = self._encrypt_password(wifi_password)
 
         # Check MQTT password
-        if 'mqtt' in self.config and 'password' in self.config['mqtt']:
-            plaintext_password = self.config['mqtt']['password']
-            if plaintext_password and not plaintext_password.startswith('mac_xor:'):
-                print("Migrating MQTT password to encrypted format...")
-                encrypted_password = self._encrypt_password(plaintext_password)
-                self.config['mqtt']['password'] = encrypted_password
-                config_changed = True
-
-        # Save updated configuration if passwords were migrated
-        if config_changed:
-            print("Saving configuration with encrypted passwords...")
-            self._save_config()
-            print("✓ Password migration completed successfully")
+        if not mqtt_password.startswith('mac_xor:'):
+            print("Migrating MQTT password to encrypted format...")
+            self._mqtt_password_plain = mqtt_password
+            mqtt['password'] = self._encrypt_password(mqtt_password)
+
+        # Save updated configuration with the migrated passwords
+        print("Saving configuration with encrypted passwords...")
+        self._save_config()
+        print("✓ Password migration completed successfully")
 
     def _validate_config(self):
         """Validate configuration structure and required fields"""
-        if not isinstance(self.config, dict):
+        config = self.config
+        if not isinstance(config, dict):
             raise ConfigError("Configuration must be a JSON object")
 
         # Required top-level sections
-        required_sections = ['wifi', 'mqtt', 'tank', 'hardware']
-        for section in required_sections:
-            if section not in self.config:
-                raise ConfigError("Missing required section: " + section)
+        if 'wifi' not in config:
+            raise ConfigError("Missing required section: wifi")
+        if 'mqtt' not in config:
+            raise ConfigError("Missing required section: mqtt")
+        if 'tank' not in config:
+            raise ConfigError("Missing required section: tank")
+        if 'hardware' not in config:
+            raise ConfigError("Missing required section: hardware")
 
         # Validate WiFi configuration
-        wifi = self.config['wifi']
-        if not wifi.get('ssid') or wifi['ssid'] == "YOUR_WIFI_SSID":
+        wifi = config['wifi']
+        ssid = wifi.get('ssid')
+        wifi_password = wifi.get('password')
+        if not ssid or ssid == "YOUR_WIFI_SSID":
             raise ConfigError("WiFi SSID not configured")
-        if not wifi.get('password') or wifi['password'] == "YOUR_WIFI_PASSWORD":
+        if not wifi_password or wifi_password == "YOUR_WIFI_PASSWORD":
             raise ConfigError("WiFi password not configured")
 
         # Validate MQTT configuration
-        mqtt = self.config['mqtt']
-        if not mqtt.get('broker'):
+        mqtt = config['mqtt']
+        broker = mqtt.get('broker')
+        mqtt_password = mqtt.get('password')
+        if not broker:
             raise ConfigError("MQTT broker not configured")
         # Check for template placeholder values
-        if mqtt['broker'] == "mqtt.example.com" or mqtt['broker'] == "your.mqtt.broker":
+        if broker == "mqtt.example.com" or broker == "your.mqtt.broker":
             raise ConfigError("MQTT broker still has placeholder value - update config.json")
         if not mqtt.get('username'):
             raise ConfigError("MQTT username not configured")
-        if not mqtt.get('password') or mqtt['password'] == "YOUR_MQTT_PASSWORD":
+        if not mqtt_password or mqtt_password == "YOUR_MQTT_PASSWORD":
             raise ConfigError("MQTT password not configured")
 
         # Validate SSL configuration
@@ -201,21 +255,20 @@ class ConfigManager:
             raise ConfigError("SSL is required for MQTT connections - set 'ssl': true")
 
         # Validate port for SSL
-        port = mqtt.get('port', 8883)
-        if ssl_enabled and port == 1883:
+        if mqtt.get('port', 8883) == 1883:
             print("WARNING: Using SSL with port 1883 - consider using port 8883 for SSL MQTT")
 
         # Validate tank configuration
-        tank = self.config['tank']
-        if not isinstance(tank.get('height'), (int, float)) or tank['height'] <= 0:
+        height = config['tank'].get('height')
+        if not isinstance(height, (int, float)) or height <= 0:
             raise ConfigError("Tank height must be a positive number")
 
         # Validate hardware configuration
-        hardware = self.config['hardware']
-        required_pins = ['sda_pin', 'scl_pin']
-        for pin in required_pins:
-            if not isinstance(hardware.get(pin), int):
-                raise ConfigError("Hardware pin " + pin + " must be an integer")
+        hardware = config['hardware']
+        if not isinstance(hardware.get('sda_pin'), int):
+            raise ConfigError("Hardware pin sda_pin must be an integer")
+        if not isinstance(hardware.get('scl_pin'), int):
+            raise ConfigError("Hardware pin scl_pin must be an integer")
 
         print("Configuration validation successful")
 
@@ -229,60 +282,74 @@ class ConfigManager:
             return self.config.get(section, default)
         else:
             # Return specific key from section
-            section_data = self.config.get(section, {})
+            section_data = self.config.get(section)
+            if section_data is None:
+                return default
             return section_data.get(key, default)
 
-    def get_wifi_config(self):
-        """Get WiFi configuration with decrypted password"""
-        encrypted_password = self.get('wifi', 'password')
-        return {
+    def _cache_sections(self):
+        """Build the section dicts returned by the get_*() accessors once"""
+        self._wifi_config = {
             'ssid': self.get('wifi', 'ssid'),
-            'password': self._decrypt_password(encrypted_password)
+            'password': self._wifi_password_plain
         }
-
-    def get_mqtt_config(self):
-        """Get MQTT configuration with decrypted password"""
-        encrypted_password = self.get('mqtt', 'password')
-        return {
+        self._mqtt_config = {
             'broker': self.get('mqtt', 'broker'),
             'port': self.get('mqtt', 'port', 8883),
             'username': self.get('mqtt', 'username'),
-            'password': self._decrypt_password(encrypted_password),
+            'password': self._mqtt_password_plain,
             'client_id_prefix': self.get('mqtt', 'client_id_prefix', 'tank_monitor'),
             'ssl': self.get('mqtt', 'ssl', True)
         }
-
-    def get_tank_config(self):
-        """Get tank configuration"""
-        return {
+        self._tank_config = {
             'height': self.get('tank', 'height'),
             'calibration_offset': self.get('tank', 'calibration_offset', 0.0),
             'empty_level': self.get('tank', 'empty_level', 0)
         }
-
-    def get_thresholds(self):
-        """Get alert thresholds"""
-        return {
+        self._thresholds = {
             'low_level': self.get('thresholds', 'low_level', 10.0),
             'high_level': self.get('thresholds', 'high_level', 95.0)
         }
-
-    def get_intervals(self):
-        """Get timing intervals"""
-        return {
+        self._intervals = {
             'measurement': self.get('intervals', 'measurement', 5.0),
             'publish': self.get('intervals', 'publish', 30.0),
             'wifi_check': self.get('intervals', 'wifi_check', 300)
         }
-
-    def get_hardware_config(self):
-        """Get hardware configuration"""
-        return {
+        self._hardware_config = {
             'sda_pin': self.get('hardware', 'sda_pin'),
             'scl_pin': self.get('hardware', 'scl_pin'),
             'i2c_freq': self.get('hardware', 'i2c_freq', 400000)
         }
 
+        # Plain attributes for direct use in Pin/I2C constructors
+        self.sda_pin = self._hardware_config['sda_pin']
+        self.scl_pin = self._hardware_config['scl_pin']
+        self.i2c_freq = self._hardware_config['i2c_freq']
+
+    def get_wifi_config(self):
+        """Get WiFi configuration with decrypted password"""
+        return self._wifi_config
+
+    def get_mqtt_config(self):
+        """Get MQTT configuration with decrypted password"""
+        return self._mqtt_config
+
+    def get_tank_config(self):
+        """Get tank configuration"""
+        return self._tank_config
+
+    def get_thresholds(self):
+        """Get alert thresholds"""
+        return self._thresholds
+
+    def get_intervals(self):
+        """Get timing intervals"""
+        return self._intervals
+
+    def get_hardware_config(self):
+        """Get hardware configuration"""
+        return self._hardware_config
+
     def update_calibration_offset(self, offset):
         """Update calibration offset and save to file"""
         try:
@@ -293,6 +360,7 @@ class ConfigManager:
             if 'tank' not in self.config:
                 self.config['tank'] = {}
             self.config['tank']['calibration_offset'] = float(offset)
+            self._tank_config['calibration_offset'] = float(offset)
 
             # Save updated configuration
             self._save_config()
@@ -304,38 +372,61 @@ class ConfigManager:
     def _save_config(self):
         """Save current configuration to file"""
         try:
+            # Free as much contiguous RAM as possible for the JSON string
+            gc.collect()
             # Use json.dumps() for MicroPython compatibility
             json_str = json.dumps(self.config)
-            with open(self.config_path, 'w') as f:
+
+            # Write to a temp file and rename so a power loss mid-write
+            # cannot leave a truncated config behind
+            tmp_path = self.config_path + '.tmp'
+            with open(tmp_path, 'w') as f:
                 f.write(json_str)
+            # Release the serialized copy immediately rather than at the next GC cycle
+            del json_str
+            gc.collect()
+            try:
+                os.rename(tmp_path, self.config_path)
+            except OSError as e:
+                # FAT cannot rename over an existing file; anything else is a
+                # real failure and the live config must be left in place
+                if e.errno != errno.EEXIST:
+                    raise
+                os.remove(self.config_path)
+                os.rename(tmp_path, self.config_path)
             print("Configuration saved to {}".format(self.config_path))
         except (OSError, ValueError) as e:
             raise ConfigError("Failed to save configuration: " + str(e))
 
-def create_default_config():
-    """Create a default configuration file from template"""
+def create_default_config(write=True):
+    """Load the config template, copying it to config.json if write is set.
+    Returns the parsed template dict, or None on failure"""
     try:
         template_path = "config/config.json.template"
         config_path = "config/config.json"
 
-        if not ConfigManager()._file_exists(template_path):
+        if not _file_exists(template_path):
             print("Template file not found: {}".format(template_path))
-            return False
+            return None
 
-        # Copy template to config file
         with open(template_path, 'r') as template:
             content = template.read()
 
-        with open(config_path, 'w') as config:
-            config.write(content)
+        config = json.loads(content)
 
-        print("Default configuration created: {}".format(config_path))
-        print("Please edit this file with your actual credentials")
-        return True
+        if write:
+            # Copy template to config file
+            with open(config_path, 'w') as config_file:
+                config_file.write(content)
+
+            print("Default configuration created: {}".format(config_path))
+            print("Please edit this file with your actual credentials")
+
+        return config
 
     except Exception as e:
         print("Failed to create default config: {}".format(str(e)))
-        return False
+        return None
 
 # Test function for development
 def test_config():
@@ -0,0 +1,61 @@
+"""
+Tank Profile Checks
+Development helper - prints interpolation results for the built-in tank
+profile. Not needed on a production device.
+
+Run on the ESP32:
+    import devtools.check_tank_profiles
+    devtools.check_tank_profiles.test_interpolation()
+
+Copyright (C) 2025
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+from tank_profiles import depth_to_gallons, gallons_to_depth, DEFAULT_PROFILE
+
+
+def test_interpolation():
+    """Test the interpolation function with known values"""
+    profile = DEFAULT_PROFILE
+
+    print("Testing 275 Gallon Vertical Oval Tank Profile")
+    print("=" * 50)
+
+    # Test exact values from table
+    test_depths = [1, 10, 22, 44]
+    expected = [2, 51, 137, 275]
+
+    print("\nExact value tests:")
+    for depth, exp in zip(test_depths, expected):
+        result = depth_to_gallons(depth, profile)
+        status = "PASS" if result == exp else "FAIL"
+        print("  {}\" -> {} gallons (expected {}) {}".format(depth, result, exp, status))
+
+    # Test interpolated values
+    print("\nInterpolation tests:")
+    test_cases = [
+        (1.5, 3.5),   # Between 1" (2gal) and 2" (5gal)
+        (22.5, 140.5), # Between 22" (137gal) and 23" (144gal)
+        (43.5, 273.5), # Between 43" (272gal) and 44" (275gal)
+    ]
+
+    for depth, expected_approx in test_cases:
+        result = depth_to_gallons(depth, profile)
+        print("  {}\" -> {:.1f} gallons (expected ~{:.1f})".format(
+            depth, result, expected_approx))
+
+    # Test edge cases
+    print("\nEdge case tests:")
+    print("  0\" -> {} gallons".format(depth_to_gallons(0, profile)))
+    print("  50\" (overflow) -> {} gallons".format(depth_to_gallons(50, profile)))
+
+    # Test reverse calculation
+    print("\nReverse calculation tests:")
+    test_gallons = [50, 137, 250]
+    for gal in test_gallons:
+        depth = gallons_to_depth(gal, profile)
+        print("  {} gallons -> {:.1f}\"".format(gal, depth))
+
+
+if __name__ == "__main__":
+    test_interpolation()
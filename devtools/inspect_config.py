@@ -0,0 +1,103 @@
+"""
+Configuration Inspection
+Development helper - loads and displays config/config.json. Not needed on a
+production device; setup.py's menu imports it on demand.
+
+Copyright (C) 2025
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+import json
+import os
+from config_manager import ConfigManager, ConfigError
+
+# Parsed config.json, reused until the file's size or mtime changes
+# (mtime alone can miss a rewrite within the same second)
+_cfg_cache = {'stamp': None, 'data': None}
+
+def _load_cached():
+    """Load config/config.json, reusing the last parse if the file is unchanged"""
+    st = os.stat("config/config.json")
+    stamp = (st[6], st[8])
+    if _cfg_cache['stamp'] != stamp:
+        with open("config/config.json", 'r') as f:
+            _cfg_cache['data'] = json.load(f)
+        _cfg_cache['stamp'] = stamp
+    return _cfg_cache['data']
+
+def test_configuration():
+    """Test the current configuration"""
+    print("=" * 60)
+    print("     CONFIGURATION TEST")
+    print("=" * 60)
+
+    try:
+        config = ConfigManager()
+        print("✓ Configuration loaded successfully")
+
+        # Test WiFi config
+        wifi_config = config.get_wifi_config()
+        print("✓ WiFi SSID: {}".format(wifi_config['ssid']))
+
+        # Test MQTT config
+        mqtt_config = config.get_mqtt_config()
+        print("✓ MQTT Broker: {}".format(mqtt_config['broker']))
+        print("✓ MQTT Username: {}".format(mqtt_config['username']))
+
+        # Test tank config
+        tank_config = config.get_tank_config()
+        print("✓ Tank Height: {} inches".format(tank_config['height']))
+
+        # Test hardware config
+        hw_config = config.get_hardware_config()
+        print("✓ I2C Pins: SDA={}, SCL={}".format(hw_config['sda_pin'], hw_config['scl_pin']))
+
+        print("\nConfiguration test PASSED!")
+        return True
+
+    except ConfigError as e:
+        print("Configuration error: {}".format(str(e)))
+        return False
+    except Exception as e:
+        print("Test failed: {}".format(str(e)))
+        return False
+
+def show_current_config():
+    """Display current configuration"""
+    try:
+        config = _load_cached()
+
+        print("=" * 60)
+        print("     CURRENT CONFIGURATION")
+        print("=" * 60)
+
+        wifi_cfg = config['wifi']
+        print("\nWiFi:")
+        print("  SSID: {}".format(wifi_cfg['ssid']))
+        print("  Password: {}".format("*" * len(wifi_cfg['password'])))
+
+        mqtt_cfg = config['mqtt']
+        print("\nMQTT:")
+        print("  Broker: {}".format(mqtt_cfg['broker']))
+        print("  Port: {}".format(mqtt_cfg['port']))
+        print("  Username: {}".format(mqtt_cfg['username']))
+        print("  Password: {}".format("*" * len(mqtt_cfg['password'])))
+        print("  SSL: {}".format(mqtt_cfg.get('ssl', True)))
+        print("  SSL Insecure: {}".format(mqtt_cfg.get('ssl_insecure', False)))
+
+        tank_cfg = config['tank']
+        print("\nTank:")
+        print("  Height: {} inches".format(tank_cfg['height']))
+        print("  Calibration Offset: {}".format(tank_cfg['calibration_offset']))
+
+        hw_cfg = config['hardware']
+        print("\nHardware:")
+        print("  SDA Pin: {}".format(hw_cfg['sda_pin']))
+        print("  SCL Pin: {}".format(hw_cfg['scl_pin']))
+
+    except Exception as e:
+        print("Failed to show configuration: {}".format(str(e)))
+
+if __name__ == "__main__":
+    test_configuration()
+    show_current_config()
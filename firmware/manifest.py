@@ -0,0 +1,18 @@
+# manifest.py - Frozen module manifest for a custom ESP32 firmware build
+# Freezing compiles these modules into the firmware image, so they are not
+# parsed on every boot and their bytecode runs from flash instead of RAM.
+#
+# Build from the MicroPython source tree:
+#   cd micropython/ports/esp32
+#   make BOARD=ESP32_GENERIC FROZEN_MANIFEST=/path/to/esp32_mqtt_tank_monitor/firmware/manifest.py
+#
+# Do not upload the frozen .py files to the ESP32 afterwards - files on the
+# filesystem take precedence over frozen modules.
+
+# Keep the port's default frozen modules (umqtt, etc.)
+include("$(PORT_DIR)/boards/manifest.py")
+
+module("config_manager.py", base_path="..")
+module("mqtt_tank_monitor.py", base_path="..")
+# Saves parsing only - the profile arrays are still built in RAM on import
+module("tank_profiles.py", base_path="..")
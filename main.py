@@ -3,9 +3,26 @@
 # MicroPython 1.25 Compatible Version with Integrated Watchdog
 
 import machine
-import time
 import sys
 
+# Multi-line banners are written with a single sys.stdout.write()
+_START_BANNER = (
+    "========================================\n"
+    "Tank Monitor Starting...\n"
+    "========================================\n")
+
+_RECOVERY_BANNER = (
+    "========================================\n"
+    "RECOVERY MODE ACTIVE\n"
+    "========================================\n"
+    "Main application failed to start\n"
+    "Available commands:\n"
+    "- help() - Show this message\n"
+    "- restart() - Restart ESP32\n"
+    "- test_sensor() - Basic sensor test\n"
+    "- check_files() - List files\n"
+    "========================================\n")
+
 def watchdog_timer():
     """Setup watchdog timer for automatic recovery"""
     try:
@@ -38,6 +55,7 @@ def main_application():
         
         print("Creating monitor instance...")
         monitor = TankLevelMonitor()
+        _set_start_attempts(0)  # Started successfully
         
         # Pass watchdog to the monitor for continuous feeding
         monitor.wdt = wdt
@@ -59,16 +77,7 @@ def main_application():
 
 def recovery_mode():
     """Simple recovery mode with basic functionality"""
-    print("="*40)
-    print("RECOVERY MODE ACTIVE")
-    print("="*40)
-    print("Main application failed to start")
-    print("Available commands:")
-    print("- help() - Show this message")
-    print("- restart() - Restart ESP32")
-    print("- test_sensor() - Basic sensor test")
-    print("- check_files() - List files")
-    print("="*40)
+    sys.stdout.write(_RECOVERY_BANNER)
     
     def restart():
         print("Restarting ESP32...")
@@ -100,42 +109,56 @@ def recovery_mode():
     globals()['check_files'] = check_files
     globals()['help'] = help
 
+def _get_start_attempts():
+    """Read the failed-start counter kept in RTC memory (survives machine.reset())"""
+    try:
+        data = machine.RTC().memory()
+        return data[0] if data else 0
+    except (AttributeError, OSError):
+        return 0
+
+def _set_start_attempts(count):
+    """Store the failed-start counter in RTC memory"""
+    try:
+        machine.RTC().memory(bytes([count]))
+    except (AttributeError, OSError):
+        pass
+
 def safe_main():
     """Main function with comprehensive error handling"""
-    print("="*40)
-    print("Tank Monitor Starting...")
-    print("="*40)
+    sys.stdout.write(_START_BANNER)
     
-    retry_count = 0
     max_retries = 3
+    attempt = _get_start_attempts() + 1
     
-    while retry_count < max_retries:
-        try:
-            print("Attempt {}/{}".format(retry_count + 1, max_retries))
-            
-            if main_application():
-                print("Application ended normally")
-                break
-            else:
-                print("Application failed, retrying...")
-                retry_count += 1
-                time.sleep(10)  # Wait before retry
-                
-        except KeyboardInterrupt:
-            print("\nApplication stopped by user (Ctrl+C)")
-            break
-        except Exception as e:
-            print("Unexpected error: {}".format(str(e)))
-            retry_count += 1
-            if retry_count < max_retries:
-                print("Retrying in 10 seconds... ({}/{})".format(
-                    retry_count, max_retries))
-                time.sleep(10)
-    
-    if retry_count >= max_retries:
+    if attempt > max_retries:
         print("Max retries ({}) reached - entering recovery mode".format(
             max_retries))
+        _set_start_attempts(0)  # Next reset gets a fresh set of attempts
         recovery_mode()
+        print("Entering REPL mode...")
+        return
+    
+    # Retry via full reset rather than in-process: a reset gives the next
+    # attempt a clean, unfragmented heap
+    _set_start_attempts(attempt)
+    try:
+        print("Attempt {}/{}".format(attempt, max_retries))
+        
+        if main_application():
+            print("Application ended normally")
+        else:
+            print("Application failed, resetting...")
+            machine.reset()
+            
+    except KeyboardInterrupt:
+        # A deliberate stop is not a failed start - don't count it towards
+        # recovery mode (RTC memory survives soft resets)
+        _set_start_attempts(0)
+        print("\nApplication stopped by user (Ctrl+C)")
+    except Exception as e:
+        print("Unexpected error: {}".format(str(e)))
+        machine.reset()
     
     print("Entering REPL mode...")
 
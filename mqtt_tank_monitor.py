@@ -14,21 +14,65 @@ the Free Software Foundation, either version 3 of the License, or
 import machine
 import time
 import network
-import json
 import gc
 import sys
+import array
 import ubinascii
-
-# Constants
-VL53L1X_I2C_ADDRESS = 0x29
-SENSOR_MIN_READING_MM = 0
-SENSOR_MAX_READING_MM = 8000  # Reasonable max range for VL53L1X
+from micropython import const
+
+# Constants - integer const() values are inlined by the MicroPython compiler
+_VL53L1X_I2C_ADDRESS = const(0x29)
+_I2C_MIN_FREQ_HZ = const(400000)  # VL53L1X supports 400 kHz fast mode
+_SENSOR_MIN_READING_MM = const(0)
+_SENSOR_MAX_READING_MM = const(8000)  # Reasonable max range for VL53L1X
+_GALLONS_LUT_STEPS_PER_INCH = const(10)  # 0.1 inch resolution for the gallons table
+_SENSOR_SAMPLE_GAP_MS = const(50)  # Let the sensor finish a new ranging cycle between samples
 MM_TO_INCHES = 25.4
-MQTT_KEEPALIVE_SEC = 60
-MQTT_CONNECT_TIMEOUT_SEC = 10
-MAX_CONSECUTIVE_FAILURES = 10
-RESTART_COOLDOWN_SEC = 60
+_MQTT_KEEPALIVE_SEC = const(60)
+_MQTT_CONNECT_TIMEOUT_SEC = const(10)
+_MAX_CONSECUTIVE_FAILURES = const(10)
+_RESTART_COOLDOWN_SEC = const(60)
 OFFLINE_STATUS_DELAY_SEC = 0.5
+_SYS_INFO_PUBLISH_INTERVAL = const(10)  # Refresh RSSI/free memory every N publishes
+_MIN_FREE_BYTES = const(20000)  # Force a collection in the loop below this much free heap
+_TLS_MIN_IDF_BLOCK = const(20480)  # Smallest contiguous IDF heap block mbedtls handshakes need
+
+# Alert bit flags -> precomputed JSON arrays of alert names
+_ALERT_LOW = const(1)
+_ALERT_HIGH = const(2)
+_ALERT_EMPTY = const(4)
+_ALERT_FULL = const(8)
+_ALERT_NAMES = ("low_level", "high_level", "empty", "full")
+_ALERT_JSON = tuple(
+    '[' + ','.join('"' + name + '"' for bit, name in enumerate(_ALERT_NAMES) if flags >> bit & 1) + ']'
+    for flags in range(16))
+
+# Static remainder of the shared HA "device" object, serialized once and
+# spliced into every discovery payload after the device identifier
+_DISCOVERY_DEVICE_TAIL = '"],"name":"Tank Level Monitor","model":"ESP32 VL53L1X","manufacturer":"DIY"}'
+
+# Home Assistant discovery sensors: (unique_id suffix, JSON body fragment)
+_DISCOVERY_SENSORS = (
+    ("_level_inches",
+     '"name":"Tank Level","value_template":"{{ value_json.level_inches | round(2) }}",'
+     '"unit_of_measurement":"in","device_class":"distance","icon":"mdi:water-level"'),
+    ("_level_percentage",
+     '"name":"Tank Level Percentage","value_template":"{{ value_json.level_percentage | round(1) }}",'
+     '"unit_of_measurement":"%","icon":"mdi:water-percent"'),
+    ("_distance_mm",
+     '"name":"Tank Distance Sensor","value_template":"{{ value_json.distance_mm | round(0) }}",'
+     '"unit_of_measurement":"mm","device_class":"distance","icon":"mdi:ruler"'),
+    ("_free_memory",
+     '"name":"Tank Monitor Memory","value_template":"{{ value_json.free_memory | round(0) }}",'
+     '"unit_of_measurement":"bytes","icon":"mdi:memory"'),
+    ("_wifi_rssi",
+     '"name":"Tank Monitor WiFi Signal","value_template":"{{ value_json.wifi_rssi }}",'
+     '"unit_of_measurement":"dBm","device_class":"signal_strength","icon":"mdi:wifi"'),
+)
+_DISCOVERY_GALLONS = (
+    "_gallons",
+    '"name":"Tank Volume","value_template":"{{ value_json.gallons | round(1) }}",'
+    '"unit_of_measurement":"gal","device_class":"volume","icon":"mdi:gauge"')
 
 # Try to import MQTT library with fallback
 try:
@@ -57,7 +101,7 @@ except ImportError:
 
 # Try to import tank profiles for non-linear calculations
 try:
-    from tank_profiles import depth_to_gallons, get_tank_profile, TANK_275_VERTICAL_OVAL
+    from tank_profiles import depth_to_gallons, TANK_PROFILES
     TANK_PROFILES_AVAILABLE = True
 except ImportError:
     print("Warning: tank_profiles.py not found - using linear calculation")
@@ -81,15 +125,20 @@ class TankLevelMonitor:
     def __init__(self):
         """Initialize tank monitor with MQTT support"""
         self.wifi = None
+        self._wifi_status = None  # Bound WLAN methods, re-bound in connect_wifi()
+        self._wifi_isconnected = None
         self.mqtt = None
         self.sensor = None
-        self.last_publish = 0
-        self.last_wifi_check = 0
         self.wifi_retry_count = 0
         self.mqtt_retry_count = 0
         self.wdt = None  # Watchdog will be set by main.py
         self.shutdown_requested = False  # Flag for graceful shutdown
         self.tank_profile = None  # Tank profile for non-linear calculations
+        self._gallons_lut = None  # Flat depth->gallons table built from the profile
+        self._sys_info_counter = 0  # Publishes until system info is refreshed
+        self._cached_rssi = None
+        self._cached_memfree = None
+        self._samples = array.array('H', [0, 0, 0])  # Reused median-of-3 buffer
 
         # Load configuration
         self.config = self._load_configuration()
@@ -97,11 +146,20 @@ class TankLevelMonitor:
         # Load tank profile if available
         self._load_tank_profile()
 
+        # Cache configuration values used on every loop iteration
+        self._cache_config()
+
+        # Monotonic ticks; start "one interval ago" so the first check runs immediately
+        now = time.ticks_ms()
+        self.last_publish_ms = time.ticks_add(now, -self._publish_interval_ms)
+        self.last_wifi_check_ms = time.ticks_add(now, -self._wifi_check_interval_ms)
+
         # Generate device identifiers
         self.client_id = get_client_id(self.config.get_mqtt_config().get('client_id_prefix', 'tank_monitor'))
         self.device_id = self.client_id
         self.mqtt_base_topic = "homeassistant/sensor/" + self.device_id
-        self.mqtt_state_topic = self.mqtt_base_topic + "/state"
+        # Stored as bytes: publish() sends topics as bytes on the wire
+        self.mqtt_state_topic = (self.mqtt_base_topic + "/state").encode()
 
         # Check dependencies
         if not SENSOR_AVAILABLE:
@@ -122,19 +180,24 @@ class TankLevelMonitor:
         
         # Send Home Assistant discovery config
         self.send_ha_discovery()
+
+        # Let the allocator trigger collections once a quarter of the free
+        # heap has been used, instead of collecting on every loop iteration
+        gc.collect()
+        gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
         
         print("Tank Monitor with MQTT ready!")
     
     def feed_watchdog(self):
         """Feed the watchdog timer if available"""
-        try:
-            if hasattr(self, 'wdt') and self.wdt:
-                self.wdt.feed()
-        except (AttributeError, OSError) as e:
-            # Watchdog feeding failed - log but don't crash
-            # AttributeError: wdt object issue
-            # OSError: watchdog hardware error
-            pass
+        # self.wdt is always set in __init__, so no hasattr() probe is needed
+        wdt = self.wdt
+        if wdt is not None:
+            try:
+                wdt.feed()
+            except OSError:
+                # Watchdog hardware error - don't crash
+                pass
     
     def _load_configuration(self):
         """Load and validate configuration"""
@@ -146,6 +209,25 @@ class TankLevelMonitor:
             print("Configuration error: {}".format(str(e)))
             raise RuntimeError("Failed to load configuration: " + str(e))
 
+    def _cache_config(self):
+        """Copy frequently used configuration values into plain attributes"""
+        tank_config = self.config.get_tank_config()
+        self._tank_height = tank_config['height']
+        self._calib_offset = tank_config['calibration_offset']
+        self._empty_level = tank_config['empty_level']
+        self._full_threshold = self._tank_height - 1
+
+        thresholds = self.config.get_thresholds()
+        self._low_thr = thresholds['low_level']
+        self._high_thr = thresholds['high_level']
+
+        intervals = self.config.get_intervals()
+        self._measurement_interval = intervals['measurement']
+        self._publish_interval = intervals['publish']
+        # Interval comparisons use time.ticks_ms(), so keep millisecond copies
+        self._publish_interval_ms = int(self._publish_interval * 1000)
+        self._wifi_check_interval_ms = int(intervals['wifi_check'] * 1000)
+
     def _load_tank_profile(self):
         """Load tank profile for non-linear volume calculations"""
         if not TANK_PROFILES_AVAILABLE:
@@ -161,9 +243,15 @@ class TankLevelMonitor:
             return
 
         # Load the profile
-        profile = get_tank_profile(tank_type)
+        profile = TANK_PROFILES.get(tank_type)
         if profile:
             self.tank_profile = profile
+            # Sample the profile once into a typed array so readings use
+            # index math instead of searching the profile tables
+            steps = profile['height_inches'] * _GALLONS_LUT_STEPS_PER_INCH
+            self._gallons_lut = array.array('f', (
+                depth_to_gallons(i / _GALLONS_LUT_STEPS_PER_INCH, profile)
+                for i in range(steps + 1)))
             print("Loaded tank profile: {}".format(profile['name']))
             print("  Capacity: {} gallons, Height: {} inches".format(
                 profile['capacity_gallons'], profile['height_inches']))
@@ -171,6 +259,18 @@ class TankLevelMonitor:
             print("Warning: Tank profile '{}' not found - using linear calculation".format(tank_type))
             self.tank_profile = None
     
+    def _lookup_gallons(self, depth_inches):
+        """Interpolate gallons for a depth from the precomputed lookup table"""
+        lut = self._gallons_lut
+        pos = depth_inches * _GALLONS_LUT_STEPS_PER_INCH
+        idx = int(pos)
+        if idx < 0:
+            return lut[0]
+        if idx >= len(lut) - 1:
+            return lut[-1]
+        g0 = lut[idx]
+        return g0 + (lut[idx + 1] - g0) * (pos - idx)
+
     def init_hardware(self):
         """
         Initialize I2C bus and VL53L1X sensor
@@ -185,25 +285,28 @@ class TankLevelMonitor:
         self.feed_watchdog()
         
         try:
-            # Get hardware configuration
-            hw_config = self.config.get_hardware_config()
-
-            # Initialize I2C
+            # Initialize I2C (never slower than fast mode)
+            config = self.config
+            freq = config.i2c_freq
+            if freq < _I2C_MIN_FREQ_HZ:
+                print("Warning: i2c_freq {} Hz is below fast mode - using {} Hz".format(
+                    freq, _I2C_MIN_FREQ_HZ))
+                freq = _I2C_MIN_FREQ_HZ
             self.i2c = machine.I2C(0,
-                                 scl=machine.Pin(hw_config['scl_pin']),
-                                 sda=machine.Pin(hw_config['sda_pin']),
-                                 freq=hw_config['i2c_freq'])
+                                 scl=machine.Pin(config.scl_pin),
+                                 sda=machine.Pin(config.sda_pin),
+                                 freq=freq)
             
             # Scan for devices
             devices = self.i2c.scan()
             device_list = [hex(addr) for addr in devices]
             print("I2C devices found: {}".format(device_list))
 
-            if VL53L1X_I2C_ADDRESS not in devices:
-                raise RuntimeError("VL53L1X sensor not found at address {}".format(hex(VL53L1X_I2C_ADDRESS)))
+            if _VL53L1X_I2C_ADDRESS not in devices:
+                raise RuntimeError("VL53L1X sensor not found at address {}".format(hex(_VL53L1X_I2C_ADDRESS)))
 
             # Initialize sensor
-            self.sensor = VL53L1X(self.i2c, address=VL53L1X_I2C_ADDRESS)
+            self.sensor = VL53L1X(self.i2c, address=_VL53L1X_I2C_ADDRESS)
             print("Sensor initialized")
             self.feed_watchdog()
             
@@ -227,6 +330,9 @@ class TankLevelMonitor:
         print("Connecting to WiFi...")
         self.wifi = network.WLAN(network.STA_IF)
         self.wifi.active(True)
+        # Cache bound methods used on the monitor loop's hot paths
+        self._wifi_status = self.wifi.status
+        self._wifi_isconnected = self.wifi.isconnected
         self.feed_watchdog()
         
         for attempt in range(max_retries):
@@ -270,15 +376,14 @@ class TankLevelMonitor:
     
     def check_wifi_connection(self):
         """Check WiFi connection and reconnect if needed"""
-        current_time = time.time()
-        wifi_check_interval = self.config.get_intervals()['wifi_check']
-        if (current_time - self.last_wifi_check) < wifi_check_interval:
+        current_time = time.ticks_ms()
+        if time.ticks_diff(current_time, self.last_wifi_check_ms) < self._wifi_check_interval_ms:
             return True  # Too soon to check again
         
-        self.last_wifi_check = current_time
+        self.last_wifi_check_ms = current_time
         self.feed_watchdog()
         
-        if not self.wifi.isconnected():
+        if not self._wifi_isconnected():
             print("WiFi disconnected, attempting reconnect...")
             if self.connect_wifi(max_retries=2):
                 # Reinitialize MQTT after WiFi reconnection
@@ -326,12 +431,15 @@ class TankLevelMonitor:
                 port=mqtt_config['port'],
                 user=mqtt_config['username'] if mqtt_config['username'] else None,
                 password=mqtt_config['password'] if mqtt_config['password'] else None,
-                keepalive=MQTT_KEEPALIVE_SEC,
+                keepalive=_MQTT_KEEPALIVE_SEC,
                 ssl=ssl_context
             )
 
+            if ssl_enabled:
+                self._check_tls_heap()
+
             # Connect with timeout
-            self.mqtt.connect(clean_session=True, timeout=MQTT_CONNECT_TIMEOUT_SEC)
+            self.mqtt.connect(clean_session=True, timeout=_MQTT_CONNECT_TIMEOUT_SEC)
             print("Connected to MQTT broker at {}".format(mqtt_config['broker']))
             self.mqtt_retry_count = 0
             self.feed_watchdog()
@@ -342,60 +450,55 @@ class TankLevelMonitor:
             self.mqtt_retry_count += 1
             return False
     
+    def _check_tls_heap(self):
+        """
+        Free memory ahead of the TLS handshake and report IDF heap headroom
+
+        mbedtls allocates from the ESP-IDF heap, not the MicroPython heap, and
+        needs large contiguous blocks. Collecting first lets a growable
+        MicroPython heap give back unused areas before the handshake.
+        """
+        gc.collect()
+        try:
+            import esp32
+            largest = max(info[2] for info in esp32.idf_heap_info(esp32.HEAP_DATA))
+        except (ImportError, AttributeError, ValueError):
+            # Not an ESP32 port, or no IDF heap information available
+            return
+        if largest < _TLS_MIN_IDF_BLOCK:
+            print("Warning: largest free IDF heap block is {} bytes - TLS may fail".format(largest))
+
+    def _discovery_messages(self):
+        """
+        Yield Home Assistant discovery (topic, payload) pairs as bytes
+
+        Payloads are spliced from pre-serialized JSON fragments rather than
+        building a dict and calling json.dumps() per sensor. Pairs are
+        generated one at a time, so only the message being published is on
+        the heap.
+        """
+        head = ('{"state_topic":"' + self.mqtt_base_topic + '/state' +
+                '","device":{"identifiers":["' + self.device_id + _DISCOVERY_DEVICE_TAIL +
+                ',"unique_id":"' + self.device_id)
+
+        sensors = _DISCOVERY_SENSORS
+        # Add gallons sensor if using non-linear tank profile
+        if self.tank_profile:
+            sensors = sensors + (_DISCOVERY_GALLONS,)
+
+        for suffix, body in sensors:
+            yield (("homeassistant/sensor/" + self.device_id + suffix + "/config").encode(),
+                   (head + suffix + '",' + body + '}').encode())
+
     def send_ha_discovery(self):
         """Send Home Assistant MQTT Discovery configuration"""
         print("Sending Home Assistant discovery config...")
         self.feed_watchdog()
-        
-        device_info = {
-            "identifiers": [self.device_id],
-            "name": "Tank Level Monitor",
-            "model": "ESP32 VL53L1X",
-            "manufacturer": "DIY"
-        }
-
-        # Create sensor configs with optimized string formatting and shared device_info
-        base_config = {
-            "state_topic": self.mqtt_state_topic,
-            "device": device_info
-        }
-
-        configs = [
-            ("Tank Level", "{}_level_inches".format(self.device_id),
-             "{{ value_json.level_inches | round(2) }}", "in", "distance", "mdi:water-level"),
-            ("Tank Level Percentage", "{}_level_percentage".format(self.device_id),
-             "{{ value_json.level_percentage | round(1) }}", "%", None, "mdi:water-percent"),
-            ("Tank Distance Sensor", "{}_distance_mm".format(self.device_id),
-             "{{ value_json.distance_mm | round(0) }}", "mm", "distance", "mdi:ruler"),
-            ("Tank Monitor Memory", "{}_free_memory".format(self.device_id),
-             "{{ value_json.free_memory | round(0) }}", "bytes", None, "mdi:memory"),
-            ("Tank Monitor WiFi Signal", "{}_wifi_rssi".format(self.device_id),
-             "{{ value_json.wifi_rssi }}", "dBm", "signal_strength", "mdi:wifi")
-        ]
-
-        # Add gallons sensor if using non-linear tank profile
-        if self.tank_profile:
-            configs.append(
-                ("Tank Volume", "{}_gallons".format(self.device_id),
-                 "{{ value_json.gallons | round(1) }}", "gal", "volume", "mdi:gauge")
-            )
 
         # Publish discovery configs
         try:
-            for name, unique_id, value_template, unit, device_class, icon in configs:
-                config = base_config.copy()
-                config.update({
-                    "name": name,
-                    "unique_id": unique_id,
-                    "value_template": value_template,
-                    "unit_of_measurement": unit,
-                    "icon": icon
-                })
-                if device_class:
-                    config["device_class"] = device_class
-
-                topic = "homeassistant/sensor/{}/config".format(unique_id)
-                self.mqtt.publish(topic, json.dumps(config), retain=True)
+            for topic, payload in self._discovery_messages():
+                self.mqtt.publish(topic, payload, retain=True)
                 self.feed_watchdog()
             print("Home Assistant discovery sent")
         except Exception as e:
@@ -406,7 +509,7 @@ class TankLevelMonitor:
         Read current tank level from sensor and calculate fill percentage
 
         Performs the following steps:
-        1. Reads distance from VL53L1X sensor (in mm)
+        1. Reads distance from VL53L1X sensor (in mm), median of 3 samples
         2. Validates reading is within acceptable range
         3. Converts to inches and calculates water level
         4. Applies calibration offset
@@ -415,7 +518,6 @@ class TankLevelMonitor:
         Returns:
             dict or None: Dictionary with keys:
                 - distance_mm: Raw sensor reading in millimeters
-                - distance_inches: Distance in inches
                 - level_inches: Calculated water level
                 - level_percentage: Tank fill percentage (0-100)
                 - timestamp: Reading timestamp
@@ -423,23 +525,35 @@ class TankLevelMonitor:
         """
         try:
             self.feed_watchdog()
-            distance_mm = self.sensor.read()
-            
-            # Validate sensor reading
-            if distance_mm is None:
-                print("Sensor returned None")
-                return None
 
-            if distance_mm <= SENSOR_MIN_READING_MM or distance_mm > SENSOR_MAX_READING_MM:
+            # Median of three samples rejects single-sample outliers.
+            # A None sample is stored as 0 so it fails range validation.
+            samples = self._samples
+            read = self.sensor.read
+            samples[0] = read() or 0
+            time.sleep_ms(_SENSOR_SAMPLE_GAP_MS)
+            samples[1] = read() or 0
+            time.sleep_ms(_SENSOR_SAMPLE_GAP_MS)
+            samples[2] = read() or 0
+            a = samples[0]
+            b = samples[1]
+            c = samples[2]
+            if a > b:
+                a, b = b, a
+            if c < b:
+                b = c
+            distance_mm = a if a > b else b
+
+            # Validate sensor reading
+            if distance_mm <= _SENSOR_MIN_READING_MM or distance_mm > _SENSOR_MAX_READING_MM:
                 print("Invalid sensor reading: {} mm (valid range: {}-{})".format(
-                    distance_mm, SENSOR_MIN_READING_MM, SENSOR_MAX_READING_MM))
+                    distance_mm, _SENSOR_MIN_READING_MM, _SENSOR_MAX_READING_MM))
                 return None
 
             # Get tank configuration
-            tank_config = self.config.get_tank_config()
-            tank_height = tank_config['height']
-            calibration_offset = tank_config['calibration_offset']
-            empty_level = tank_config['empty_level']
+            tank_height = self._tank_height
+            calibration_offset = self._calib_offset
+            empty_level = self._empty_level
 
             # Convert distance to inches
             distance_inches = distance_mm / MM_TO_INCHES
@@ -453,7 +567,7 @@ class TankLevelMonitor:
             # Calculate volume using tank profile or linear method
             if self.tank_profile:
                 # Use non-linear lookup table
-                gallons = depth_to_gallons(liquid_depth, self.tank_profile)
+                gallons = self._lookup_gallons(liquid_depth)
                 tank_capacity = self.tank_profile['capacity_gallons']
 
                 # Calculate percentage based on actual capacity
@@ -475,7 +589,6 @@ class TankLevelMonitor:
             # Build response dictionary
             response = {
                 'distance_mm': round(distance_mm, 1),
-                'distance_inches': round(distance_inches, 2),
                 'level_inches': round(liquid_depth, 2),
                 'level_percentage': round(percentage, 1),
                 'timestamp': time.time()
@@ -499,30 +612,43 @@ class TankLevelMonitor:
         try:
             self.feed_watchdog()
             
-            # Add additional metadata using .update() method (MicroPython 1.25 compatible)
-            payload = {}
-            payload.update(reading)
-            payload['tank_height'] = self.config.get_tank_config()['height']
-            payload['device_id'] = self.device_id
-            payload['alerts'] = self.get_alerts(reading)
+            # Fixed-schema payload, formatted directly instead of building a
+            # dict and serializing it with json.dumps()
+            parts = [
+                '{"distance_mm":%s,"level_inches":%s,"level_percentage":%s,"timestamp":%s' % (
+                    reading['distance_mm'], reading['level_inches'],
+                    reading['level_percentage'], reading['timestamp'])
+            ]
+            if 'gallons' in reading:
+                parts.append(',"gallons":%s' % reading['gallons'])
+
+            parts.append(',"tank_height":%s,"device_id":"%s","alerts":%s' % (
+                self._tank_height, self.device_id, _ALERT_JSON[self._alert_flags(reading)]))
             
-            # Add system info
-            try:
-                # WiFi signal strength
-                if self.wifi and self.wifi.isconnected():
-                    payload['wifi_rssi'] = self.wifi.status('rssi')
-
-                # Free memory
-                payload['free_memory'] = gc.mem_free()
-            except (OSError, AttributeError, ValueError):
-                # OSError: WiFi error
-                # AttributeError: object not initialized
-                # ValueError: invalid status parameter
-                pass  # System info not critical
+            # Add system info, refreshed every _SYS_INFO_PUBLISH_INTERVAL publishes
+            if self._sys_info_counter == 0:
+                try:
+                    # WiFi signal strength
+                    if self._wifi_isconnected and self._wifi_isconnected():
+                        self._cached_rssi = self._wifi_status('rssi')
+
+                    # Free memory
+                    self._cached_memfree = gc.mem_free()
+                except (OSError, AttributeError, ValueError):
+                    # OSError: WiFi error
+                    # AttributeError: object not initialized
+                    # ValueError: invalid status parameter
+                    pass  # System info not critical
+            self._sys_info_counter = (self._sys_info_counter + 1) % _SYS_INFO_PUBLISH_INTERVAL
+
+            if self._cached_rssi is not None:
+                parts.append(',"wifi_rssi":%d' % self._cached_rssi)
+            if self._cached_memfree is not None:
+                parts.append(',"free_memory":%d' % self._cached_memfree)
+            parts.append('}')
             
             # Publish to MQTT
-            json_payload = json.dumps(payload)
-            self.mqtt.publish(self.mqtt_state_topic, json_payload)
+            self.mqtt.publish(self.mqtt_state_topic, ''.join(parts))
             
             print("Published: {}in ({}%)".format(
                 reading['level_inches'], reading['level_percentage']))
@@ -533,26 +659,21 @@ class TankLevelMonitor:
             print("MQTT publish error: {}".format(str(e)))
             return False
     
-    def get_alerts(self, reading):
-        """Get current alerts"""
-        alerts = []
+    def _alert_flags(self, reading):
+        """Get current alerts as a bit mask of _ALERT_* flags"""
         percentage = reading['level_percentage']
         level = reading['level_inches']
 
-        # Get thresholds from configuration
-        thresholds = self.config.get_thresholds()
-        tank_height = self.config.get_tank_config()['height']
-
-        if percentage < thresholds['low_level']:
-            alerts.append("low_level")
-        if percentage > thresholds['high_level']:
-            alerts.append("high_level")
+        flags = 0
+        if percentage < self._low_thr:
+            flags |= _ALERT_LOW
+        if percentage > self._high_thr:
+            flags |= _ALERT_HIGH
         if level <= 0:
-            alerts.append("empty")
-        if level >= tank_height - 1:
-            alerts.append("full")
-
-        return alerts
+            flags |= _ALERT_EMPTY
+        if level >= self._full_threshold:
+            flags |= _ALERT_FULL
+        return flags
 
     def shutdown(self):
         """
@@ -572,11 +693,9 @@ class TankLevelMonitor:
         # Disconnect MQTT
         if self.mqtt:
             try:
-                # Send offline status
-                offline_payload = json.dumps({
-                    'status': 'offline',
-                    'timestamp': time.time()
-                })
+                # Send offline status - literal format, no dict or json.dumps()
+                # since shutdown often follows a MemoryError
+                offline_payload = '{"status":"offline","timestamp":%d}' % int(time.time())
                 self.mqtt.publish(self.mqtt_state_topic, offline_payload)
                 time.sleep(OFFLINE_STATUS_DELAY_SEC)  # Brief delay for message delivery
 
@@ -624,7 +743,7 @@ class TankLevelMonitor:
         avg_distance_inches = avg_distance_mm / 25.4
 
         # Calculate calibration offset
-        tank_height = self.config.get_tank_config()['height']
+        tank_height = self._tank_height
         calibration_offset = tank_height - avg_distance_inches
 
         print("\nCalibration Results:")
@@ -635,18 +754,29 @@ class TankLevelMonitor:
         try:
             # Update configuration with new offset
             self.config.update_calibration_offset(calibration_offset)
+            self._cache_config()
             print("\nCalibration saved successfully!")
             return True
         except Exception as e:
             print("Failed to save calibration: " + str(e))
             return False
 
+    def _restart_after_cooldown(self, loop_start_ms, reason):
+        """Reset the device, first waiting out the boot-loop cooldown if needed"""
+        elapsed_ms = time.ticks_diff(time.ticks_ms(), loop_start_ms)
+        if 0 <= elapsed_ms < _RESTART_COOLDOWN_SEC * 1000:
+            wait_ms = _RESTART_COOLDOWN_SEC * 1000 - elapsed_ms
+            print("Cooldown active - waiting {}s before restart to prevent boot loop".format(wait_ms // 1000))
+            self.feed_watchdog()
+            time.sleep_ms(wait_ms)
+        print(reason + " - restarting...")
+        machine.reset()
+
     def monitor_loop(self):
         """Main monitoring loop with comprehensive error handling and watchdog support"""
         # Get configuration intervals
-        intervals = self.config.get_intervals()
-        measurement_interval = intervals['measurement']
-        publish_interval = intervals['publish']
+        measurement_interval = self._measurement_interval
+        publish_interval = self._publish_interval
 
         print("Starting tank monitoring with MQTT...")
         print("Device ID: {}".format(self.device_id))
@@ -654,7 +784,7 @@ class TankLevelMonitor:
         print("Publish interval: {}s".format(publish_interval))
         
         # Show watchdog status
-        if hasattr(self, 'wdt') and self.wdt:
+        if self.wdt is not None:
             print("Watchdog protection: ACTIVE")
         else:
             print("Watchdog protection: DISABLED")
@@ -663,7 +793,7 @@ class TankLevelMonitor:
         print("-" * 60)
         
         consecutive_failures = 0
-        last_restart_time = 0
+        loop_start_ms = time.ticks_ms()
 
         try:
             while True:
@@ -675,21 +805,15 @@ class TankLevelMonitor:
                 # Feed watchdog at the start of each loop iteration
                 self.feed_watchdog()
 
-                # Periodic garbage collection
-                gc.collect()
+                # Garbage collection is threshold-driven; only force it when low
+                if gc.mem_free() < _MIN_FREE_BYTES:
+                    gc.collect()
                 
                 # Check WiFi connection periodically
                 if not self.check_wifi_connection():
                     consecutive_failures += 1
-                    if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                        current_time = time.time()
-                        time_since_last_restart = current_time - last_restart_time
-                        if time_since_last_restart < RESTART_COOLDOWN_SEC:
-                            wait_time = RESTART_COOLDOWN_SEC - time_since_last_restart
-                            print("Cooldown active - waiting {}s before restart to prevent boot loop".format(int(wait_time)))
-                            time.sleep(wait_time)
-                        print("Too many consecutive failures - restarting...")
-                        machine.reset()
+                    if consecutive_failures >= _MAX_CONSECUTIVE_FAILURES:
+                        self._restart_after_cooldown(loop_start_ms, "Too many consecutive failures")
                     time.sleep(measurement_interval)
                     continue
                 
@@ -705,30 +829,23 @@ class TankLevelMonitor:
                         reading['distance_mm'], gc.mem_free()))
                     
                     # Publish to MQTT if it's time
-                    current_time = time.time()
-                    if (current_time - self.last_publish) >= publish_interval:
+                    current_time = time.ticks_ms()
+                    if time.ticks_diff(current_time, self.last_publish_ms) >= self._publish_interval_ms:
                         if self.publish_data(reading):
-                            self.last_publish = current_time
+                            self.last_publish_ms = current_time
                         else:
                             # Try to reconnect MQTT if publish failed
                             if self.init_mqtt():
                                 # Retry publish once
                                 if self.publish_data(reading):
-                                    self.last_publish = current_time
+                                    self.last_publish_ms = current_time
                 else:
                     consecutive_failures += 1
                     print("Sensor read failed ({}/{})".format(
-                        consecutive_failures, MAX_CONSECUTIVE_FAILURES))
-
-                    if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                        current_time = time.time()
-                        time_since_last_restart = current_time - last_restart_time
-                        if time_since_last_restart < RESTART_COOLDOWN_SEC:
-                            wait_time = RESTART_COOLDOWN_SEC - time_since_last_restart
-                            print("Cooldown active - waiting {}s before restart to prevent boot loop".format(int(wait_time)))
-                            time.sleep(wait_time)
-                        print("Too many sensor failures - restarting...")
-                        machine.reset()
+                        consecutive_failures, _MAX_CONSECUTIVE_FAILURES))
+
+                    if consecutive_failures >= _MAX_CONSECUTIVE_FAILURES:
+                        self._restart_after_cooldown(loop_start_ms, "Too many sensor failures")
                 
                 # Feed watchdog before sleep
                 self.feed_watchdog()
@@ -6,7 +6,20 @@ MicroPython 1.25 Compatible
 
 import json
 import os
-from config_manager import create_default_config, ConfigManager, ConfigError
+from config_manager import create_default_config
+
+# Invalid entries allowed per prompt before falling back to its default
+_MAX_PROMPT_ATTEMPTS = 5
+
+# ESP32 valid GPIO pins (common ones)
+_VALID_PINS = (0, 1, 2, 3, 4, 5, 12, 13, 14, 15, 16, 17, 18, 19, 21, 22, 23, 25, 26, 27, 32, 33, 34, 35, 36, 39)
+_ERR_PIN = "ERROR: Invalid GPIO pin. Common pins: 21, 22, 23, 25, 26, 27, 32, 33"
+
+# Same pins, one bit per pin number
+_VALID_PIN_MASK = 0
+for _pin in _VALID_PINS:
+    _VALID_PIN_MASK |= 1 << _pin
+del _pin
 
 def setup_wizard():
     """Interactive setup wizard for first-time configuration"""
@@ -30,15 +43,12 @@ def setup_wizard():
                 print("Setup cancelled.")
                 return False
 
-        # Create default config from template
-        if not create_default_config():
-            print("Failed to create configuration file.")
+        # Start from the template; the file is only written once at the end
+        config = create_default_config(write=False)
+        if not config:
+            print("Failed to load configuration template.")
             return False
 
-        # Load the config for editing
-        with open("config/config.json", 'r') as f:
-            config = json.load(f)
-
         print("\n--- WiFi Configuration ---")
         ssid = input_with_fallback("WiFi Network Name (SSID): ", "")
         if not ssid:
@@ -50,25 +60,32 @@ def setup_wizard():
             print("WiFi password is required!")
             return False
 
-        config['wifi']['ssid'] = ssid
-        config['wifi']['password'] = password
+        wifi_cfg = config['wifi']
+        wifi_cfg['ssid'] = ssid
+        wifi_cfg['password'] = password
 
         print("\n--- MQTT Configuration ---")
 
         # Validate MQTT broker IP
-        while True:
+        for _ in range(_MAX_PROMPT_ATTEMPTS):
             broker = input_with_fallback("MQTT Broker IP Address: ", "192.168.1.100")
             if validate_ip_address(broker):
                 break
             print("ERROR: Invalid IP address format. Please use format: 192.168.1.100")
+        else:
+            print("Too many invalid attempts, using default: 192.168.1.100")
+            broker = "192.168.1.100"
 
         # Validate MQTT port
-        while True:
+        for _ in range(_MAX_PROMPT_ATTEMPTS):
             port_str = input_with_fallback("MQTT Port (8883 for SSL): ", "8883")
-            if validate_port(port_str):
-                port = port_str
+            port = parse_port(port_str)
+            if port is not None:
                 break
             print("ERROR: Invalid port number. Must be between 1 and 65535")
+        else:
+            print("Too many invalid attempts, using default: 8883")
+            port = 8883
 
         username = input_with_fallback("MQTT Username: ", "")
         mqtt_password = input_with_fallback("MQTT Password: ", "")
@@ -84,55 +101,67 @@ def setup_wizard():
             print("MQTT credentials are required!")
             return False
 
-        config['mqtt']['broker'] = broker
-        config['mqtt']['port'] = int(port)
-        config['mqtt']['username'] = username
-        config['mqtt']['password'] = mqtt_password
-        config['mqtt']['ssl'] = True
-        config['mqtt']['ssl_insecure'] = ssl_insecure_bool
+        mqtt_cfg = config['mqtt']
+        mqtt_cfg['broker'] = broker
+        mqtt_cfg['port'] = port
+        mqtt_cfg['username'] = username
+        mqtt_cfg['password'] = mqtt_password
+        mqtt_cfg['ssl'] = True
+        mqtt_cfg['ssl_insecure'] = ssl_insecure_bool
 
         print("\n--- Tank Configuration ---")
 
         # Validate tank height
-        while True:
+        for _ in range(_MAX_PROMPT_ATTEMPTS):
             height_str = input_with_fallback("Tank Height (inches): ", "44")
-            try:
-                height = float(height_str)
-                if height > 0 and height <= 1000:  # Reasonable max
-                    break
-                print("ERROR: Tank height must be between 0 and 1000 inches")
-            except ValueError:
-                print("ERROR: Invalid number format")
+            height = parse_tank_height(height_str)
+            if height is not None:
+                break
+            print("ERROR: Tank height must be a number between 0 and 1000 inches")
+        else:
+            print("Too many invalid attempts, using default: 44")
+            height = 44.0
 
         config['tank']['height'] = height
 
         print("\n--- Hardware Configuration ---")
 
         # Validate SDA pin
-        while True:
+        for _ in range(_MAX_PROMPT_ATTEMPTS):
             sda_pin_str = input_with_fallback("I2C SDA Pin (21): ", "21")
-            if validate_pin(sda_pin_str):
-                sda_pin = int(sda_pin_str)
+            sda_pin = parse_pin(sda_pin_str)
+            if sda_pin is not None:
                 break
-            print("ERROR: Invalid GPIO pin. Common pins: 21, 22, 23, 25, 26, 27, 32, 33")
+            print(_ERR_PIN)
+        else:
+            print("Too many invalid attempts, using default: 21")
+            sda_pin = 21
 
         # Validate SCL pin
-        while True:
+        for _ in range(_MAX_PROMPT_ATTEMPTS):
             scl_pin_str = input_with_fallback("I2C SCL Pin (22): ", "22")
-            if validate_pin(scl_pin_str):
-                scl_pin = int(scl_pin_str)
+            scl_pin = parse_pin(scl_pin_str)
+            if scl_pin is not None:
                 if scl_pin != sda_pin:
                     break
                 print("ERROR: SCL pin must be different from SDA pin")
             else:
-                print("ERROR: Invalid GPIO pin. Common pins: 21, 22, 23, 25, 26, 27, 32, 33")
+                print(_ERR_PIN)
+        else:
+            # The default collides if SDA was moved onto it
+            if sda_pin == 22:
+                print("Too many invalid attempts and default SCL pin 22 is used by SDA")
+                return False
+            print("Too many invalid attempts, using default: 22")
+            scl_pin = 22
 
-        config['hardware']['sda_pin'] = sda_pin
-        config['hardware']['scl_pin'] = scl_pin
+        hw_cfg = config['hardware']
+        hw_cfg['sda_pin'] = sda_pin
+        hw_cfg['scl_pin'] = scl_pin
 
         # Save updated configuration
         with open("config/config.json", 'w') as f:
-            f.write(json.dumps(config))
+            json.dump(config, f)
 
         print("\n" + "=" * 60)
         print("     CONFIGURATION SAVED!")
@@ -140,6 +169,11 @@ def setup_wizard():
         print()
         print("Next steps:")
         print("1. Upload all files to your ESP32")
+        print("   (optional: precompile and upload the .mpy files instead -")
+        print("   'mpy-cross -O2' for setup.py and mqtt_tank_monitor.py,")
+        print("   'mpy-cross -O2 -march=xtensawin' for tank_profiles.py;")
+        print("   custom firmware can freeze them via firmware/manifest.py")
+        print("   - see README)")
         print("2. Run calibrate.py when tank is empty")
         print("3. Restart ESP32 to begin monitoring")
         print()
@@ -148,7 +182,7 @@ def setup_wizard():
         return True
 
     except Exception as e:
-        print("Setup failed: {}".format(str(e)))
+        print(f"Setup failed: {e}")
         return False
 
 def input_with_fallback(prompt, default):
@@ -159,110 +193,56 @@ def input_with_fallback(prompt, default):
     except (EOFError, KeyboardInterrupt):
         # EOFError: input() not available (non-interactive mode)
         # KeyboardInterrupt: user cancelled
-        print("{} (using default: {})".format(prompt, str(default)))
+        print(f"{prompt} (using default: {default})")
         return default
 
 def validate_ip_address(ip_str):
     """Validate IP address format (basic validation for MicroPython)"""
-    try:
-        parts = ip_str.split('.')
-        if len(parts) != 4:
-            return False
-        for part in parts:
-            num = int(part)
-            if num < 0 or num > 255:
+    # Single pass over the characters - no split() list or int() per octet
+    dots = 0
+    val = 0
+    empty = True
+    for c in ip_str:
+        if '0' <= c <= '9':
+            val = val * 10 + ord(c) - 48
+            if val > 255:
                 return False
-        return True
-    except:
-        return False
+            empty = False
+        elif c == '.':
+            if empty:
+                return False
+            dots += 1
+            val = 0
+            empty = True
+        else:
+            return False
+    return dots == 3 and not empty
 
-def validate_port(port_str):
-    """Validate port number"""
+def parse_port(port_str):
+    """Parse port number, returning None if invalid"""
     try:
         port = int(port_str)
-        return 1 <= port <= 65535
+        return port if 1 <= port <= 65535 else None
     except:
-        return False
+        return None
 
-def validate_pin(pin_str):
-    """Validate GPIO pin number for ESP32"""
+def parse_pin(pin_str):
+    """Parse GPIO pin number for ESP32, returning None if invalid"""
     try:
         pin = int(pin_str)
-        # ESP32 valid GPIO pins (common ones)
-        valid_pins = [0, 1, 2, 3, 4, 5, 12, 13, 14, 15, 16, 17, 18, 19, 21, 22, 23, 25, 26, 27, 32, 33, 34, 35, 36, 39]
-        return pin in valid_pins
+        if 0 <= pin <= 39 and (_VALID_PIN_MASK >> pin) & 1:
+            return pin
+        return None
     except:
-        return False
-
-def test_configuration():
-    """Test the current configuration"""
-    print("=" * 60)
-    print("     CONFIGURATION TEST")
-    print("=" * 60)
+        return None
 
+def parse_tank_height(height_str):
+    """Parse tank height in inches, returning None if invalid"""
     try:
-        config = ConfigManager()
-        print("✓ Configuration loaded successfully")
-
-        # Test WiFi config
-        wifi_config = config.get_wifi_config()
-        print("✓ WiFi SSID: {}".format(wifi_config['ssid']))
-
-        # Test MQTT config
-        mqtt_config = config.get_mqtt_config()
-        print("✓ MQTT Broker: {}".format(mqtt_config['broker']))
-        print("✓ MQTT Username: {}".format(mqtt_config['username']))
-
-        # Test tank config
-        tank_config = config.get_tank_config()
-        print("✓ Tank Height: {} inches".format(tank_config['height']))
-
-        # Test hardware config
-        hw_config = config.get_hardware_config()
-        print("✓ I2C Pins: SDA={}, SCL={}".format(hw_config['sda_pin'], hw_config['scl_pin']))
-
-        print("\nConfiguration test PASSED!")
-        return True
-
-    except ConfigError as e:
-        print("Configuration error: {}".format(str(e)))
-        return False
-    except Exception as e:
-        print("Test failed: {}".format(str(e)))
-        return False
-
-def show_current_config():
-    """Display current configuration"""
-    try:
-        with open("config/config.json", 'r') as f:
-            config = json.load(f)
-
-        print("=" * 60)
-        print("     CURRENT CONFIGURATION")
-        print("=" * 60)
-
-        print("\nWiFi:")
-        print("  SSID: {}".format(config['wifi']['ssid']))
-        print("  Password: {}".format("*" * len(config['wifi']['password'])))
-
-        print("\nMQTT:")
-        print("  Broker: {}".format(config['mqtt']['broker']))
-        print("  Port: {}".format(config['mqtt']['port']))
-        print("  Username: {}".format(config['mqtt']['username']))
-        print("  Password: {}".format("*" * len(config['mqtt']['password'])))
-        print("  SSL: {}".format(config['mqtt'].get('ssl', True)))
-        print("  SSL Insecure: {}".format(config['mqtt'].get('ssl_insecure', False)))
-
-        print("\nTank:")
-        print("  Height: {} inches".format(config['tank']['height']))
-        print("  Calibration Offset: {}".format(config['tank']['calibration_offset']))
-
-        print("\nHardware:")
-        print("  SDA Pin: {}".format(config['hardware']['sda_pin']))
-        print("  SCL Pin: {}".format(config['hardware']['scl_pin']))
-
-    except Exception as e:
-        print("Failed to show configuration: {}".format(str(e)))
+        height = float(height_str)
+        return height if 0 < height <= 1000 else None  # Reasonable max
+    except:
+        return None
 
 def main():
     """Main setup function"""
@@ -276,10 +256,17 @@ def main():
 
     if choice == "1":
         setup_wizard()
-    elif choice == "2":
-        test_configuration()
-    elif choice == "3":
-        show_current_config()
+    elif choice in ("2", "3"):
+        # devtools/ is an optional upload
+        try:
+            import devtools.inspect_config as inspect_config
+        except ImportError:
+            print("devtools/ not uploaded - see README")
+            return
+        if choice == "2":
+            inspect_config.test_configuration()
+        else:
+            inspect_config.show_current_config()
     else:
         print("Exiting setup.")
 
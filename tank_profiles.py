@@ -6,6 +6,9 @@ Copyright (C) 2025
 SPDX-License-Identifier: GPL-3.0-or-later
 """
 
+import micropython
+from array import array
+
 # 275 Gallon Vertical Oil Tank (Oval/Obround)
 # Dimensions: 60" length × 27" width × 44" height
 # Data source: https://www.fuelsnap.com/heating_oil_tank_charts.php
@@ -19,24 +22,33 @@ TANK_275_VERTICAL_OVAL = {
     'height_inches': 44,
     'width_inches': 27,
     'length_inches': 60,
-    # Lookup table: depth in inches -> gallons
-    'depth_inches': [
+    # Lookup table: depth in inches -> gallons, packed as flat arrays
+    # depth_inches must be a uniform 1-inch grid (depth_to_gallons indexes it directly)
+    'depth_inches': array('B', [
         1, 2, 3, 4, 5, 6, 7, 8, 9, 10,
         11, 12, 13, 14, 15, 16, 17, 18, 19, 20,
         21, 22, 23, 24, 25, 26, 27, 28, 29, 30,
         31, 32, 33, 34, 35, 36, 37, 38, 39, 40,
         41, 42, 43, 44
-    ],
-    'gallons': [
+    ]),
+    'gallons': array('H', [
         2, 5, 9, 14, 19, 25, 31, 37, 44, 51,
         58, 65, 72, 80, 87, 94, 101, 108, 115, 123,
         130, 137, 144, 151, 158, 166, 173, 180, 187, 194,
         201, 209, 216, 223, 230, 236, 243, 249, 254, 260,
         265, 269, 272, 275
-    ]
+    ])
 }
 
+_gallons = TANK_275_VERTICAL_OVAL['gallons']
+# Per-segment slopes (gallons per inch) for depth_to_gallons()
+TANK_275_VERTICAL_OVAL['slopes'] = array('f', [
+    _gallons[i + 1] - _gallons[i] for i in range(len(_gallons) - 1)
+])
+del _gallons
+
 
+@micropython.native
 def linear_interpolate(x, x0, x1, y0, y1):
     """
     Linear interpolation between two points
@@ -56,13 +68,14 @@ def linear_interpolate(x, x0, x1, y0, y1):
     return y0 + (x - x0) * (y1 - y0) / (x1 - x0)
 
 
+@micropython.native
 def depth_to_gallons(depth_inches, tank_profile):
     """
     Convert liquid depth to gallons using lookup table with interpolation
 
     Args:
         depth_inches: Measured depth of liquid in inches
-        tank_profile: Tank profile dictionary with depth_inches and gallons arrays
+        tank_profile: Tank profile dictionary with depth_inches, gallons and slopes arrays
 
     Returns:
         float: Volume in gallons, or None if depth is invalid
@@ -75,21 +88,17 @@ def depth_to_gallons(depth_inches, tank_profile):
         return 0.0
     if depth_inches >= depth_table[-1]:
         return float(gallons_table[-1])
+    if depth_inches < depth_table[0]:
+        # Below the first table entry - interpolate up from an empty tank
+        return linear_interpolate(depth_inches, 0, depth_table[0], 0, gallons_table[0])
 
-    # Find the two points to interpolate between
-    for i in range(len(depth_table) - 1):
-        if depth_inches >= depth_table[i] and depth_inches <= depth_table[i + 1]:
-            # Linear interpolation between these two points
-            return linear_interpolate(
-                depth_inches,
-                depth_table[i], depth_table[i + 1],
-                gallons_table[i], gallons_table[i + 1]
-            )
-
-    # Should never reach here if depth is validated
-    return None
+    # Depth table is a uniform 1-inch grid, so the bracketing index is direct
+    # and each segment's slope is precomputed gallons per inch
+    i = int(depth_inches - depth_table[0])
+    return gallons_table[i] + (depth_inches - depth_table[i]) * tank_profile['slopes'][i]
 
 
+@micropython.native
 def gallons_to_depth(gallons, tank_profile):
     """
     Convert gallons to depth using lookup table with interpolation
@@ -110,19 +119,24 @@ def gallons_to_depth(gallons, tank_profile):
         return 0.0
     if gallons >= gallons_table[-1]:
         return float(depth_table[-1])
-
-    # Find the two points to interpolate between
-    for i in range(len(gallons_table) - 1):
-        if gallons >= gallons_table[i] and gallons <= gallons_table[i + 1]:
-            # Linear interpolation between these two points
-            return linear_interpolate(
-                gallons,
-                gallons_table[i], gallons_table[i + 1],
-                depth_table[i], depth_table[i + 1]
-            )
-
-    # Should never reach here if gallons is validated
-    return None
+    if gallons < gallons_table[0]:
+        # Below the first table entry - interpolate down to an empty tank
+        return linear_interpolate(gallons, 0, gallons_table[0], 0, depth_table[0])
+
+    # Gallons grid is non-uniform - binary search for the bracketing segment
+    lo = 0
+    hi = len(gallons_table) - 1
+    while hi - lo > 1:
+        mid = (lo + hi) >> 1
+        if gallons_table[mid] <= gallons:
+            lo = mid
+        else:
+            hi = mid
+    return linear_interpolate(
+        gallons,
+        gallons_table[lo], gallons_table[hi],
+        depth_table[lo], depth_table[hi]
+    )
 
 
 # Available tank profiles
@@ -133,7 +147,11 @@ TANK_PROFILES = {
     # '550_vertical': TANK_550_VERTICAL,
 }
 
+# Profile for the standard 275 gallon tank, for callers that don't need a lookup
+DEFAULT_PROFILE = TANK_275_VERTICAL_OVAL
+
 
+# Deprecated: index TANK_PROFILES directly, or use DEFAULT_PROFILE
 def get_tank_profile(profile_name):
     """
     Get tank profile by name
@@ -145,51 +163,3 @@ def get_tank_profile(profile_name):
         dict: Tank profile dictionary, or None if not found
     """
     return TANK_PROFILES.get(profile_name)
-
-
-# Test function
-def test_interpolation():
-    """Test the interpolation function with known values"""
-    profile = TANK_275_VERTICAL_OVAL
-
-    print("Testing 275 Gallon Vertical Oval Tank Profile")
-    print("=" * 50)
-
-    # Test exact values from table
-    test_depths = [1, 10, 22, 44]
-    expected = [2, 51, 137, 275]
-
-    print("\nExact value tests:")
-    for depth, exp in zip(test_depths, expected):
-        result = depth_to_gallons(depth, profile)
-        status = "PASS" if result == exp else "FAIL"
-        print("  {}\" -> {} gallons (expected {}) {}".format(depth, result, exp, status))
-
-    # Test interpolated values
-    print("\nInterpolation tests:")
-    test_cases = [
-        (1.5, 3.5),   # Between 1" (2gal) and 2" (5gal)
-        (22.5, 140.5), # Between 22" (137gal) and 23" (144gal)
-        (43.5, 273.5), # Between 43" (272gal) and 44" (275gal)
-    ]
-
-    for depth, expected_approx in test_cases:
-        result = depth_to_gallons(depth, profile)
-        print("  {}\" -> {:.1f} gallons (expected ~{:.1f})".format(
-            depth, result, expected_approx))
-
-    # Test edge cases
-    print("\nEdge case tests:")
-    print("  0\" -> {} gallons".format(depth_to_gallons(0, profile)))
-    print("  50\" (overflow) -> {} gallons".format(depth_to_gallons(50, profile)))
-
-    # Test reverse calculation
-    print("\nReverse calculation tests:")
-    test_gallons = [50, 137, 250]
-    for gal in test_gallons:
-        depth = gallons_to_depth(gal, profile)
-        print("  {} gallons -> {:.1f}\"".format(gal, depth))
-
-
-if __name__ == "__main__":
-    test_interpolation()